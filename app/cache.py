@@ -0,0 +1,421 @@
+"""
+Semantic Cache Module
+Caches generated answers so repeated or near-identical queries skip the LLM round-trip.
+"""
+
+import os
+import re
+import time
+import logging
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+# Caches larger than this use an HNSW index instead of a flat scan
+FLAT_INDEX_MAX_ENTRIES = 10_000
+
+# Rows of int8 codes dequantized at a time when scoring the flat index
+_FLAT_SCORE_BLOCK = 256
+
+# The cache is persisted as one self-describing file, replaced atomically
+_CACHE_FILE = "semantic_cache.npz"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for exact-match cache lookups.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        Lowercased query with punctuation removed and surrounding whitespace stripped
+    """
+    return _PUNCTUATION_RE.sub("", query.lower()).strip()
+
+
+class _FlatIndex:
+    """
+    Exact nearest-neighbour search over int8 scalar-quantized unit vectors.
+
+    Each vector is stored as int8 codes plus a per-vector float scale, which
+    cuts memory 4x versus float32. Lookups dequantize fixed-size row blocks
+    to float32 and score them into a preallocated buffer, so temporaries
+    stay bounded instead of widening the whole matrix per query.
+    """
+
+    def __init__(self, dim: int, max_entries: int):
+        self.dim = dim
+        self.codes = np.zeros((max_entries, dim), dtype=np.int8)
+        self.scales = np.zeros(max_entries, dtype=np.float32)
+        self._scores = np.empty(max_entries, dtype=np.float32)
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+
+    def set(self, slot: int, vector: np.ndarray) -> None:
+        self.codes[slot], self.scales[slot] = self._quantize(vector)
+
+    def remove(self, slot: int) -> None:
+        self.codes[slot] = 0
+        self.scales[slot] = 0.0
+
+    def nearest(self, vector: np.ndarray) -> Tuple[int, float]:
+        query = vector.astype(np.float32, copy=False)
+        scores = self._scores
+        for start in range(0, len(self.codes), _FLAT_SCORE_BLOCK):
+            stop = start + _FLAT_SCORE_BLOCK
+            np.matmul(self.codes[start:stop].astype(np.float32), query, out=scores[start:stop])
+        scores *= self.scales
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    kind = "flat"
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes, "scales": self.scales}
+
+    @classmethod
+    def from_arrays(
+        cls, dim: int, max_entries: int, arrays: Dict[str, np.ndarray], live_slots: Sequence[int]
+    ) -> "_FlatIndex":
+        index = cls(dim, max_entries)
+        codes, scales = arrays["codes"], arrays["scales"]
+        if codes.shape[1] != dim:
+            raise ValueError(f"Saved vectors have dimension {codes.shape[1]}, expected {dim}")
+        slots = [slot for slot in live_slots if slot < len(codes)]
+        index.codes[slots] = codes[slots]
+        index.scales[slots] = scales[slots]
+        return index
+
+
+class _HNSWIndex:
+    """Approximate nearest-neighbour search backed by hnswlib."""
+
+    def __init__(self, dim: int, max_entries: int, index=None):
+        import hnswlib
+
+        self.dim = dim
+        self.max_entries = max_entries
+        if index is None:
+            index = hnswlib.Index(space="cosine", dim=dim)
+            index.init_index(max_elements=max_entries, ef_construction=100, M=16)
+        self.index = index
+        self._active: set = set()
+
+    def set(self, slot: int, vector: np.ndarray) -> None:
+        # Re-adding an existing label replaces its vector (and un-deletes it)
+        self.index.add_items(vector[np.newaxis, :], [slot])
+        self._active.add(slot)
+
+    def remove(self, slot: int) -> None:
+        if slot in self._active:
+            self.index.mark_deleted(slot)
+            self._active.discard(slot)
+
+    def nearest(self, vector: np.ndarray) -> Tuple[int, float]:
+        if not self._active:
+            return 0, 0.0
+        try:
+            labels, distances = self.index.knn_query(vector, k=1)
+        except RuntimeError:
+            # hnswlib raises when it can't find k live points; treat it as a miss
+            return 0, 0.0
+        return int(labels[0][0]), 1.0 - float(distances[0][0])
+
+    kind = "hnsw"
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        # hnswlib only serializes to a path, so round-trip through a temp file
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.bin")
+            self.index.save_index(path)
+            with open(path, "rb") as f:
+                return {"graph": np.frombuffer(f.read(), dtype=np.uint8)}
+
+    @classmethod
+    def from_arrays(
+        cls, dim: int, max_entries: int, arrays: Dict[str, np.ndarray], live_slots: Sequence[int]
+    ) -> "_HNSWIndex":
+        import hnswlib
+
+        # Build into a local so a failed load never leaves a half-initialized index
+        index = hnswlib.Index(space="cosine", dim=dim)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.bin")
+            with open(path, "wb") as f:
+                f.write(arrays["graph"].tobytes())
+            index.load_index(path, max_elements=max_entries)
+
+        # get_ids_list() also returns labels deleted before saving, so only
+        # the restored slots count as live; everything else is deleted here
+        live = set(live_slots)
+        for label in index.get_ids_list():
+            if int(label) not in live:
+                try:
+                    index.mark_deleted(int(label))
+                except RuntimeError:
+                    pass  # already deleted
+
+        restored = cls(dim, max_entries, index=index)
+        restored._active = live
+        return restored
+
+
+class SemanticCache:
+    """
+    Two-tier response cache for the RAG system.
+
+    L1 is an exact-match map keyed on the normalized query text. L2 holds the
+    embeddings of recently answered queries in a fixed-size ring buffer and
+    returns a cached response when a new query's cosine similarity to one of
+    them meets the threshold. Callers check L1 first so a literal repeat
+    never costs an embedding call.
+
+    L2 is a flat int8-quantized matrix scanned with one matrix-vector product
+    for caches of up to FLAT_INDEX_MAX_ENTRIES entries, and an HNSW index
+    beyond that.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_seconds: float = 24 * 60 * 60
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for an L2 hit
+            max_entries: Maximum number of entries held in each tier
+            ttl_seconds: Time in seconds after which an entry expires
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # L1: normalized text -> (timestamp, response), kept in LRU order
+        self._exact: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # L2: ring buffer of (timestamp, key, response) slots searched by vector.
+        # The index is created once the embedding dimension is known.
+        self._index = None
+        self._entries: List[Optional[Tuple[float, str, Dict[str, Any]]]] = [None] * max_entries
+        self._next_slot = 0
+
+    def _index_class(self):
+        """L2 vector index class appropriate for the cache size."""
+        if self.max_entries > FLAT_INDEX_MAX_ENTRIES:
+            return _HNSWIndex
+        return _FlatIndex
+
+    def _create_index(self, dim: int):
+        """Create an empty L2 vector index."""
+        return self._index_class()(dim, self.max_entries)
+
+    def _is_expired(self, timestamp: float) -> bool:
+        """Check whether an entry stored at the given timestamp has expired."""
+        return time.time() - timestamp > self.ttl_seconds
+
+    @staticmethod
+    def _normalize_vector(vector: Sequence[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 array."""
+        vector = np.array(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def get_exact(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response by normalized query text (L1).
+
+        Args:
+            query: User query
+
+        Returns:
+            Cached response dictionary, or None on a miss
+        """
+        key = normalize_query(query)
+        entry = self._exact.get(key)
+        if entry is None:
+            return None
+
+        timestamp, response = entry
+        if self._is_expired(timestamp):
+            del self._exact[key]
+            return None
+
+        self._exact.move_to_end(key)
+        logger.info("Semantic cache L1 hit")
+        return dict(response)
+
+    def get_similar(self, query: str, vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response by embedding similarity (L2).
+
+        Args:
+            query: User query, promoted into L1 on a hit
+            vector: Embedding of the query
+
+        Returns:
+            Cached response dictionary, or None on a miss
+        """
+        if self._index is None:
+            return None
+
+        slot, similarity = self._index.nearest(self._normalize_vector(vector))
+        entry = self._entries[slot]
+        if entry is None or similarity < self.similarity_threshold:
+            return None
+
+        timestamp, _, response = entry
+        if self._is_expired(timestamp):
+            self._evict_slot(slot)
+            return None
+
+        logger.info("Semantic cache L2 hit (similarity=%.3f)", similarity)
+        self._store_exact(normalize_query(query), response, timestamp)
+        return dict(response)
+
+    def store(self, query: str, response: Dict[str, Any], vector: Sequence[float]) -> None:
+        """
+        Store a response in both cache tiers.
+
+        Args:
+            query: User query the response answers
+            response: Response dictionary to cache
+            vector: Embedding of the query
+        """
+        key = normalize_query(query)
+        timestamp = time.time()
+        self._store_exact(key, response, timestamp)
+
+        vector = self._normalize_vector(vector)
+        if self._index is None:
+            self._index = self._create_index(vector.shape[0])
+
+        slot = self._next_slot
+        self._index.set(slot, vector)
+        self._entries[slot] = (timestamp, key, response)
+        self._next_slot = (slot + 1) % self.max_entries
+
+    def _store_exact(self, key: str, response: Dict[str, Any], timestamp: float) -> None:
+        """Insert an L1 entry, evicting the least recently used one if full."""
+        self._exact[key] = (timestamp, response)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+
+    def _evict_slot(self, slot: int) -> None:
+        """Clear an expired L2 slot so it can no longer match."""
+        self._index.remove(slot)
+        self._entries[slot] = None
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._exact.clear()
+        self._index = None
+        self._entries = [None] * self.max_entries
+        self._next_slot = 0
+
+    def save(self, directory: str) -> None:
+        """
+        Persist the L2 index and its entries to a directory.
+
+        Entries and vectors go into a single file that is written to a
+        temporary name and then renamed over the previous one, so a reader
+        (or a concurrent save from another worker) always sees one
+        complete, self-consistent snapshot.
+
+        Args:
+            directory: Directory to write the cache file into
+        """
+        if self._index is None:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        meta = {
+            "kind": self._index.kind,
+            "dim": self._index.dim,
+            "next_slot": self._next_slot,
+            "entries": [
+                [slot, *entry] for slot, entry in enumerate(self._entries) if entry is not None
+            ],
+        }
+        arrays = self._index.to_arrays()
+        arrays["meta"] = np.frombuffer(orjson.dumps(meta), dtype=np.uint8)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".semantic_cache-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, os.path.join(directory, _CACHE_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        logger.info("Saved semantic cache to: %s", directory)
+
+    def load(self, directory: str) -> None:
+        """
+        Restore a cache previously written by save().
+
+        Unexpired L2 entries are restored and also seed L1. The new state is
+        built aside and only swapped in once everything has loaded, so on
+        any error the cache is left unchanged. Does nothing if the directory
+        has no saved cache, or if it was saved with a different index kind
+        (e.g. after SEMANTIC_CACHE_MAX_ENTRIES crossed FLAT_INDEX_MAX_ENTRIES).
+
+        Args:
+            directory: Directory containing the cache file
+        """
+        path = os.path.join(directory, _CACHE_FILE)
+        if not os.path.exists(path):
+            return
+
+        with np.load(path) as saved:
+            arrays = {name: saved[name] for name in saved.files}
+        meta = orjson.loads(arrays.pop("meta").tobytes())
+
+        index_class = self._index_class()
+        if meta["kind"] != index_class.kind:
+            logger.info(
+                "Saved semantic cache uses a %s index, expected %s; not restoring",
+                meta["kind"], index_class.kind
+            )
+            return
+
+        entries: List[Optional[Tuple[float, str, Dict[str, Any]]]] = [None] * self.max_entries
+        for slot, timestamp, key, response in meta["entries"]:
+            if slot >= self.max_entries or self._is_expired(timestamp):
+                continue
+            entries[slot] = (timestamp, key, response)
+
+        live_slots = [slot for slot, entry in enumerate(entries) if entry is not None]
+        index = index_class.from_arrays(meta["dim"], self.max_entries, arrays, live_slots)
+
+        # Seed L1 oldest first so LRU order follows the original timestamps
+        exact: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        for timestamp, key, response in sorted((entries[slot] for slot in live_slots), key=lambda e: e[0]):
+            exact[key] = (timestamp, response)
+            exact.move_to_end(key)
+
+        self._exact = exact
+        self._entries = entries
+        self._index = index
+        self._next_slot = meta["next_slot"] % self.max_entries
+
+        logger.info("Loaded semantic cache from: %s", directory)
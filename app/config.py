@@ -0,0 +1,81 @@
+"""
+Configuration Module
+Reads environment settings once at startup into an immutable Settings object.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app import env
+
+
+def _env_flag(name: str, default: str) -> bool:
+    """Read a boolean environment variable ("true"/"false", case-insensitive)."""
+    return os.getenv(name, default).lower() == "true"
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Application settings loaded from environment variables.
+
+    Instances are immutable; pass a custom instance to VectorStoreManager or
+    LegalRAGSystem to override configuration without mutating the environment.
+    """
+
+    google_api_key: Optional[str] = None
+    chroma_db_path: str = "chroma_db_gemini"
+    cors_origins: Tuple[str, ...] = ("*",)
+    semantic_cache_enabled: bool = True
+    semantic_cache_max_entries: int = 1000
+    semantic_cache_path: str = "semantic_cache"
+    max_context_chars: int = 6000
+    gemini_api_key: str = ""
+    gemini_model: str = "models/gemini-2.5-flash"
+    fallback_provider: str = "gemini"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    reload: bool = False
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build settings from the current environment.
+
+        Returns:
+            Settings instance populated from environment variables
+        """
+        return cls(
+            google_api_key=os.getenv("GOOGLE_API_KEY"),
+            chroma_db_path=os.getenv("CHROMA_DB_PATH", "chroma_db_gemini"),
+            cors_origins=tuple(os.getenv("CORS_ORIGINS", "*").split(",")),
+            semantic_cache_enabled=_env_flag("SEMANTIC_CACHE_ENABLED", "true"),
+            semantic_cache_max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 1000)),
+            semantic_cache_path=os.getenv("SEMANTIC_CACHE_PATH", "semantic_cache"),
+            max_context_chars=int(os.getenv("MAX_CONTEXT_CHARS", 6000)),
+            gemini_api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY", ""),
+            gemini_model=os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash"),
+            fallback_provider=os.getenv("FALLBACK_PROVIDER", "gemini").lower(),
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", 8000)),
+            reload=_env_flag("RELOAD", "False"),
+        )
+
+
+# Global settings instance
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """
+    Get or load the global settings instance.
+
+    Returns:
+        Settings instance
+    """
+    global _settings
+    if _settings is None:
+        env.load()
+        _settings = Settings.from_env()
+    return _settings
@@ -0,0 +1,22 @@
+"""
+Environment Module
+Loads the .env file once per process for the app and the helper scripts.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load() -> bool:
+    """
+    Load variables from .env into the environment, at most once per process.
+
+    Existing environment variables are not overridden. Later calls return
+    the first call's result without touching the file again.
+
+    Returns:
+        True if a .env file was found and loaded
+    """
+    from dotenv import load_dotenv
+
+    return load_dotenv()
@@ -0,0 +1,52 @@
+"""
+Shared HTTP Client Module
+Provides one pooled HTTP/2 client for all async Gemini calls made by the LangChain wrappers.
+"""
+
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def create_shared_async_client() -> httpx.AsyncClient:
+    """
+    Create the process-wide async HTTP client used for Gemini API calls.
+
+    Returns:
+        httpx.AsyncClient with HTTP/2 and a keep-alive connection pool
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=60,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
+
+
+def attach_async_client(model, client: httpx.AsyncClient) -> bool:
+    """
+    Route a LangChain Google GenAI model's async requests through a shared client.
+
+    ChatGoogleGenerativeAI and GoogleGenerativeAIEmbeddings build their own
+    google-genai Client and accept no HTTP client parameter, so the shared
+    client is installed on the underlying API client instead. Versions that
+    don't expose it are left unchanged.
+
+    Args:
+        model: ChatGoogleGenerativeAI or GoogleGenerativeAIEmbeddings instance
+        client: Shared httpx.AsyncClient
+
+    Returns:
+        True if the shared client was attached
+    """
+    api_client = getattr(getattr(model, "client", None), "_api_client", None)
+    http_options = getattr(api_client, "_http_options", None)
+    if api_client is None or not hasattr(http_options, "httpx_async_client"):
+        logger.info("Shared HTTP client not supported for %s; using its own connections", type(model).__name__)
+        return False
+
+    # Setting httpx_async_client also stops google-genai from preferring aiohttp
+    http_options.httpx_async_client = client
+    api_client._async_httpx_client = client
+    return True
@@ -0,0 +1,123 @@
+import atexit
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+import orjson
+
+from app.config import get_settings
+
+GEMINI_API_KEY = get_settings().gemini_api_key
+# Expect full resource name like: models/gemini-2.5-flash
+GEMINI_MODEL = get_settings().gemini_model
+
+# Request pieces that don't depend on the prompt are built once at import
+_URL = f"https://generativelanguage.googleapis.com/v1beta/{GEMINI_MODEL}:streamGenerateContent"
+_PARAMS = {"key": GEMINI_API_KEY, "alt": "sse"}
+_HEADERS = {"content-type": "application/json"}
+_GENERATION_CONFIG = {"temperature": 0.4, "maxOutputTokens": 450}
+
+# Pooled client for the sync helpers, created on first use and closed at exit.
+# The app itself uses the async path with the client from its lifespan.
+_sync_client: Optional[httpx.Client] = None
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(http2=True, timeout=60)
+        atexit.register(_sync_client.close)
+    return _sync_client
+
+def _build_payload(system: str, user: str) -> dict:
+    # Checked per call rather than at import so the app still starts without a key
+    if not GEMINI_API_KEY:
+        raise RuntimeError("Missing GEMINI_API_KEY in .env")
+
+    return {
+        "contents": [
+            {"role": "user", "parts": [{"text": f"{system}\n\nUser: {user}"}]}
+        ],
+        "generationConfig": _GENERATION_CONFIG,
+    }
+
+def _check_status(r: httpx.Response, body: bytes) -> None:
+    if r.status_code != 200:
+        raise RuntimeError(f"Gemini API error {r.status_code}: {body.decode('utf-8', errors='replace')}")
+
+def _parse_event(line: str) -> Optional[dict]:
+    """Decode one SSE data line, raising if it reports an API error."""
+    if not line.startswith("data:"):
+        return None
+    data = orjson.loads(line[5:])
+    if "error" in data:
+        error = data["error"]
+        raise RuntimeError(f"Gemini API error {error.get('code')}: {error.get('message')}")
+    return data
+
+def _event_text(data: dict) -> str:
+    candidates = data.get("candidates") or [{}]
+    parts = candidates[0].get("content", {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+def _empty_reply_error(last: Optional[dict]) -> RuntimeError:
+    """Error for a stream that ended without any text (e.g. a blocked reply)."""
+    last = last or {}
+    reason = (last.get("promptFeedback") or {}).get("blockReason")
+    if reason is None:
+        candidates = last.get("candidates") or [{}]
+        reason = candidates[0].get("finishReason", "unknown")
+    return RuntimeError(f"Gemini returned no text (reason: {reason})")
+
+def stream_generate(system: str, user: str, client: Optional[httpx.Client] = None) -> Iterator[str]:
+    """
+    Yield the reply text chunk by chunk as Gemini generates it.
+
+    Without an explicit client, a pooled module-level client is used so
+    repeat calls reuse the TLS connection.
+    """
+    if client is None:
+        client = _get_sync_client()
+
+    payload = _build_payload(system, user)
+    with client.stream("POST", _URL, params=_PARAMS, headers=_HEADERS, content=orjson.dumps(payload)) as r:
+        if r.status_code != 200:
+            _check_status(r, r.read())
+        last, produced = None, False
+        for line in r.iter_lines():
+            data = _parse_event(line)
+            if data is None:
+                continue
+            last, chunk = data, _event_text(data)
+            if chunk:
+                produced = True
+                yield chunk
+        if not produced:
+            raise _empty_reply_error(last)
+
+async def astream_generate(system: str, user: str, client: httpx.AsyncClient) -> AsyncIterator[str]:
+    """
+    Async variant of stream_generate().
+
+    The app passes the shared client created in its lifespan, so fallback
+    calls use the same connection pool as the LangChain Gemini models.
+    """
+    payload = _build_payload(system, user)
+    async with client.stream("POST", _URL, params=_PARAMS, headers=_HEADERS, content=orjson.dumps(payload)) as r:
+        if r.status_code != 200:
+            _check_status(r, await r.aread())
+        last, produced = None, False
+        async for line in r.aiter_lines():
+            data = _parse_event(line)
+            if data is None:
+                continue
+            last, chunk = data, _event_text(data)
+            if chunk:
+                produced = True
+                yield chunk
+        if not produced:
+            raise _empty_reply_error(last)
+
+def generate(system: str, user: str, client: Optional[httpx.Client] = None) -> str:
+    return "".join(stream_generate(system, user, client)).strip()
+
+async def agenerate(system: str, user: str, client: httpx.AsyncClient) -> str:
+    return "".join([chunk async for chunk in astream_generate(system, user, client)]).strip()
@@ -3,22 +3,24 @@ Legal AI Backend - FastAPI Application
 A production-ready backend service for legal awareness and information retrieval.
 """
 
-import os
 import logging
+import httpx
+import orjson
 from typing import Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
-from dotenv import load_dotenv
-
+from app.config import get_settings
+from app.http_client import attach_async_client, create_shared_async_client
 from app.vectorstore import get_vector_store_manager, VectorStoreManager
 from app.rag import get_rag_system, LegalRAGSystem
+from app.routers import legacy_chat
 
-# Load environment variables
-load_dotenv()
+# Load settings (reads .env and the environment once)
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +32,27 @@ logger = logging.getLogger(__name__)
 # Global instances
 vector_store_manager: Optional[VectorStoreManager] = None
 rag_system: Optional[LegalRAGSystem] = None
+shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def warm_up(vector_store_manager: VectorStoreManager, rag_system: LegalRAGSystem) -> None:
+    """
+    Run a synthetic query through the embeddings, ChromaDB and the LLM.
+    
+    Loads the HNSW index into memory and opens the Gemini client connections
+    before the first user request. Failures are logged and do not block startup.
+    
+    Args:
+        vector_store_manager: Initialized VectorStoreManager
+        rag_system: Initialized LegalRAGSystem
+    """
+    logger.info("Warming up vector store and LLM...")
+    try:
+        await vector_store_manager.retrieve("warmup", k=1)
+        await rag_system.llm.ainvoke("ping")
+        logger.info("Warm-up complete")
+    except Exception as e:
+        logger.warning("Warm-up failed: %s", e)
 
 
 @asynccontextmanager
@@ -39,13 +62,13 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     # Startup: Initialize vector store and RAG system
-    global vector_store_manager, rag_system
+    global vector_store_manager, rag_system, shared_http_client
     
     try:
         logger.info("Initializing Legal AI Backend...")
         
         # Validate environment variables
-        if not os.getenv("GOOGLE_API_KEY"):
+        if not settings.google_api_key:
             raise ValueError("GOOGLE_API_KEY environment variable is required")
         
         # Initialize vector store
@@ -56,16 +79,39 @@ async def lifespan(app: FastAPI):
         logger.info("Initializing RAG system...")
         rag_system = get_rag_system(vector_store_manager)
         
+        # Share one HTTP/2 connection pool across all async Gemini calls
+        shared_http_client = create_shared_async_client()
+        attach_async_client(vector_store_manager.embeddings, shared_http_client)
+        attach_async_client(rag_system.llm, shared_http_client)
+        app.state.http_client = shared_http_client
+        
+        # Restore answers cached by a previous run
+        if rag_system.semantic_cache:
+            try:
+                rag_system.semantic_cache.load(settings.semantic_cache_path)
+            except Exception as e:
+                logger.warning("Could not load semantic cache: %s", e)
+        
+        # Warm up so the first user request doesn't pay cold-start costs
+        await warm_up(vector_store_manager, rag_system)
+        
         logger.info("Legal AI Backend initialized successfully!")
         
     except Exception as e:
-        logger.error(f"Failed to initialize backend: {str(e)}")
+        logger.error("Failed to initialize backend: %s", e)
         raise
     
     yield
     
     # Shutdown: Cleanup if needed
     logger.info("Shutting down Legal AI Backend...")
+    if rag_system and rag_system.semantic_cache:
+        try:
+            rag_system.semantic_cache.save(settings.semantic_cache_path)
+        except Exception as e:
+            logger.warning("Could not save semantic cache: %s", e)
+    if shared_http_client:
+        await shared_http_client.aclose()
 
 
 # Create FastAPI application
@@ -73,18 +119,22 @@ app = FastAPI(
     title="Legal AI Backend",
     description="A production-ready backend service for legal awareness and information retrieval using RAG (Retrieval-Augmented Generation)",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.getenv("CORS_ORIGINS", "*").split(","),
+    allow_origins=list(settings.cors_origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Mount the legacy plain-text/JSON chat endpoint
+app.include_router(legacy_chat.router, prefix="/v1")
+
 
 # Request/Response Models
 class ChatRequest(BaseModel):
@@ -175,6 +225,8 @@ async def root():
         "description": "A production-ready backend service for legal awareness",
         "endpoints": {
             "POST /chat": "Process legal queries and get answers with citations",
+            "POST /chat/stream": "Stream the answer to a legal query as server-sent events",
+            "POST /v1/chat": "Legacy plain-text or JSON chat endpoint",
             "GET /health": "Health check endpoint"
         }
     }
@@ -237,15 +289,16 @@ async def chat(request: ChatRequest):
         )
     
     try:
-        logger.info(f"Processing query: {request.query[:50]}...")
+        logger.info("Processing query: %s...", request.query[:50])
         
         # Process query through RAG system
-        result = rag_system.process_query(request.query)
+        result = await rag_system.process_query(request.query)
         
         # Convert to response model
         response = ChatResponse(
             answer=result["answer"],
-            citations=[Citation(**citation) for citation in result["citations"]],
+            # Citations are built internally, so skip re-validating them
+            citations=[Citation.model_construct(**citation) for citation in result["citations"]],
             has_context=result["has_context"]
         )
         
@@ -253,19 +306,62 @@ async def chat(request: ChatRequest):
         return response
         
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while processing your query. Please try again."
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Process a legal query and stream the answer as server-sent events.
+    
+    Each answer chunk is sent as a ``data: {"token": "..."}`` message. The
+    stream ends with an ``event: done`` message carrying the legal
+    disclaimer, citations and the has_context flag.
+    
+    Args:
+        request: ChatRequest containing the user's query
+        
+    Returns:
+        StreamingResponse with media type text/event-stream
+        
+    Raises:
+        HTTPException: If the service is not initialized
+    """
+    # Verify system is initialized
+    if not rag_system:
+        logger.error("RAG system not initialized")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is not ready. Please try again in a moment."
+        )
+    
+    logger.info("Streaming query: %s...", request.query[:50])
+    
+    async def event_stream():
+        try:
+            async for event, data in rag_system.stream_query(request.query):
+                if event == "token":
+                    yield f"data: {orjson.dumps({'token': data}).decode()}\n\n"
+                else:
+                    yield f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+        except Exception as e:
+            logger.error("Error streaming query: %s", e)
+            detail = {"detail": "An error occurred while processing your query. Please try again."}
+            yield f"event: error\ndata: {orjson.dumps(detail).decode()}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 # Error handlers
 
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     """Handle ValueError exceptions."""
-    logger.error(f"ValueError: {str(exc)}")
+    logger.error("ValueError: %s", exc)
     return JSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"detail": str(exc)}
@@ -275,7 +371,7 @@ async def value_error_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions."""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An internal error occurred. Please try again later."}
@@ -288,7 +384,7 @@ if __name__ == "__main__":
     # Run the application
     uvicorn.run(
         "app.main:app",
-        host=os.getenv("HOST", "0.0.0.0"),
-        port=int(os.getenv("PORT", 8000)),
-        reload=os.getenv("RELOAD", "False").lower() == "true"
+        host=settings.host,
+        port=settings.port,
+        reload=settings.reload
     )
@@ -3,18 +3,16 @@ RAG (Retrieval-Augmented Generation) Module
 Handles legal query processing with context retrieval and LLM-based answer generation.
 """
 
-import os
+import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Sequence
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from app.cache import SemanticCache
+from app.config import Settings, get_settings
+
 logger = logging.getLogger(__name__)
 
 # Legal disclaimer to be included with every response
@@ -66,6 +64,32 @@ If a user asks for help with illegal activities (e.g., evading law, committing c
 
 **Your Response (include relevant citations from the context):**"""
 
+# Response returned when a query asks for help with illegal activities
+ILLEGAL_RESPONSE = "I cannot provide guidance on illegal activities. If you have questions about legal compliance or your rights, I'm happy to help with that instead."
+
+# Prompt used when retrieval finds no usable context
+FALLBACK_PROMPT = """You are a helpful legal AI assistant. Answer the following question to the best of your ability:
+
+Question: {question}
+
+Provide a clear and accurate answer."""
+
+# Phrases the LLM uses when the retrieved context cannot answer the query
+_INSUFFICIENT_RE = re.compile(r"don't have enough|insufficient information", re.IGNORECASE)
+
+# Maximum characters taken from each retrieved document
+MAX_DOCUMENT_CHARS = 800
+
+_CONTEXT_SEPARATOR = "\n---\n"
+
+# Characters of a streamed RAG answer held back to detect an insufficient-context reply
+_INSUFFICIENT_PROBE_CHARS = 200
+
+# SYSTEM_PROMPT split around its placeholders once, so building a prompt is a plain join
+_PROMPT_HEAD, _rest = SYSTEM_PROMPT.split("{context}", 1)
+_PROMPT_MID, _PROMPT_TAIL = _rest.split("{question}", 1)
+del _rest
+
 
 # Illegal keywords that trigger safety protocol
 ILLEGAL_KEYWORDS = [
@@ -74,6 +98,14 @@ ILLEGAL_KEYWORDS = [
     "hack", "break law", "get away with", "cover up crime"
 ]
 
+# Single alternation so the safety check is one regex pass over the query.
+# Unanchored on purpose: keywords match anywhere, as substrings, so
+# "hacking" and "forgery" are still caught.
+_ILLEGAL_RE = re.compile(
+    "|".join(map(re.escape, ILLEGAL_KEYWORDS)),
+    re.IGNORECASE | re.ASCII
+)
+
 
 class LegalRAGSystem:
     """
@@ -83,7 +115,13 @@ class LegalRAGSystem:
     vectorized legal documents stored in ChromaDB.
     """
     
-    def __init__(self, vector_store_manager, llm_model: str = "models/gemini-2.5-flash", temperature: float = 0.3):
+    def __init__(
+        self,
+        vector_store_manager,
+        llm_model: str = "models/gemini-2.5-flash",
+        temperature: float = 0.3,
+        settings: Optional[Settings] = None
+    ):
         """
         Initialize the RAG system.
         
@@ -91,13 +129,15 @@ class LegalRAGSystem:
             vector_store_manager: VectorStoreManager instance
             llm_model: Google Gemini model name
             temperature: LLM temperature for response generation (lower = more focused)
+            settings: Application settings (defaults to the global settings)
         """
         self.vector_store_manager = vector_store_manager
         self.llm_model = llm_model
         self.temperature = temperature
+        self.settings = settings or get_settings()
         
         # Initialize LLM
-        google_api_key = os.getenv("GOOGLE_API_KEY")
+        google_api_key = self.settings.google_api_key
         if not google_api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
@@ -107,10 +147,29 @@ class LegalRAGSystem:
             google_api_key=google_api_key
         )
         
-        # Create prompt template
+        # Prompt template kept for debugging; the hot path uses _build_prompt
         self.prompt_template = ChatPromptTemplate.from_template(SYSTEM_PROMPT)
         
-        logger.info(f"RAG system initialized with model: {self.llm_model}")
+        # Initialize response cache (opt-out via SEMANTIC_CACHE_ENABLED=false)
+        self.semantic_cache: Optional[SemanticCache] = None
+        if self.settings.semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(max_entries=self.settings.semantic_cache_max_entries)
+        
+        logger.info("RAG system initialized with model: %s", self.llm_model)
+    
+    @staticmethod
+    def _build_prompt(context: str, query: str) -> List[tuple[str, str]]:
+        """
+        Build the RAG prompt messages without template parsing.
+        
+        Args:
+            context: Formatted retrieved context
+            query: User query
+            
+        Returns:
+            Message list accepted by the chat model
+        """
+        return [("human", "".join((_PROMPT_HEAD, context, _PROMPT_MID, query, _PROMPT_TAIL)))]
     
     def _is_illegal_query(self, query: str) -> bool:
         """
@@ -122,8 +181,7 @@ class LegalRAGSystem:
         Returns:
             True if query appears to request illegal guidance
         """
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in ILLEGAL_KEYWORDS)
+        return _ILLEGAL_RE.search(query) is not None
     
     def _extract_citations(self, documents: List[Document]) -> List[Dict[str, str]]:
         """
@@ -140,70 +198,123 @@ class LegalRAGSystem:
         
         for doc in documents:
             metadata = doc.metadata
-            content_snippet = doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
             
-            # Extract source information from metadata
+            # Extract source information from metadata; cite each source once
             source = metadata.get("source", "Unknown Source")
+            if source in seen_sources:
+                continue
+            seen_sources.add(source)
             
-            # Create a unique identifier to avoid duplicate citations
-            source_id = f"{source}_{content_snippet[:50]}"
+            content = doc.page_content
+            content_snippet = content[:200]
+            if len(content) > 200:
+                content_snippet += "..."
             
-            if source_id not in seen_sources:
-                citation = {
-                    "source_title": metadata.get("title", source),
-                    "source": source,
-                    "snippet": content_snippet
-                }
-                
-                # Add additional metadata if available
-                if "section" in metadata:
-                    citation["section"] = metadata["section"]
-                if "page" in metadata:
-                    citation["page"] = str(metadata["page"])
-                
-                citations.append(citation)
-                seen_sources.add(source_id)
+            citation = {
+                "source_title": metadata.get("title", source),
+                "source": source,
+                "snippet": content_snippet
+            }
+            
+            # Add additional metadata if available
+            if "section" in metadata:
+                citation["section"] = metadata["section"]
+            if "page" in metadata:
+                citation["page"] = str(metadata["page"])
+            
+            citations.append(citation)
         
         return citations
     
-    def _retrieve_context(self, query: str, k: int = 10) -> tuple[str, List[Document]]:
+    async def _retrieve_context(
+        self,
+        query: str,
+        query_vector: Optional[Sequence[float]] = None,
+        k: int = 10
+    ) -> tuple[str, List[Document]]:
         """
         Retrieve relevant context for the query.
         
         Args:
             query: User query
+            query_vector: Precomputed query embedding, if available
             k: Number of documents to retrieve
             
         Returns:
             Tuple of (formatted context string, list of documents)
         """
         try:
-            # Get retriever
-            retriever = self.vector_store_manager.get_retriever(k=k, score_threshold=0.3)
-            
-            # Retrieve relevant documents
-            documents = retriever.invoke(query)
+            # Retrieve relevant documents in a single vector search
+            documents, _ = await self.vector_store_manager.retrieve(
+                query, k=k, threshold=0.3, embedding=query_vector
+            )
             
             if not documents:
-                logger.warning(f"No relevant documents found for query: {query[:50]}...")
+                logger.warning("No relevant documents found for query: %s...", query[:50])
                 return "", []
             
-            # Format context from documents
+            # Format context from documents, trimming each one and keeping only
+            # as many as fit in the context budget to bound prompt size
+            max_context_chars = self.settings.max_context_chars
             context_parts = []
+            used_documents = []
+            context_length = 0
+            trimmed = 0
+            
             for i, doc in enumerate(documents, 1):
                 source = doc.metadata.get("source", "Unknown")
-                context_parts.append(f"[Source {i}: {source}]\n{doc.page_content}\n")
+                snippet = doc.page_content[:MAX_DOCUMENT_CHARS]
+                if len(snippet) < len(doc.page_content):
+                    trimmed += 1
+                
+                part = f"[Source {i}: {source}]\n{snippet}\n"
+                separator_length = len(_CONTEXT_SEPARATOR) if context_parts else 0
+                if used_documents and context_length + separator_length + len(part) > max_context_chars:
+                    break
+                
+                context_parts.append(part)
+                used_documents.append(doc)
+                context_length += separator_length + len(part)
             
-            context = "\n---\n".join(context_parts)
+            context = _CONTEXT_SEPARATOR.join(context_parts)
             
-            logger.info(f"Retrieved {len(documents)} documents for query")
-            return context, documents
+            logger.info(
+                "Retrieved %s documents for query (%s used, %s trimmed, %s chars)",
+                len(documents), len(used_documents), trimmed, len(context)
+            )
+            return context, used_documents
             
         except Exception as e:
-            logger.error(f"Error retrieving context: {str(e)}")
+            logger.error("Error retrieving context: %s", e)
             raise
     
-    def process_query(self, query: str) -> Dict[str, Any]:
+    async def _lookup_cache(self, query: str) -> tuple[Optional[Dict[str, Any]], Optional[Sequence[float]]]:
+        """
+        Check the semantic cache, embedding the query only if L1 misses.
+        
+        Args:
+            query: User's legal question
+            
+        Returns:
+            Tuple of (cached response or None, query embedding or None)
+        """
+        # Serve literal repeats from the cache before any embedding call
+        if self.semantic_cache:
+            cached = self.semantic_cache.get_exact(query)
+            if cached is not None:
+                return cached, None
+        
+        # Embed once; the vector is shared by the cache and retrieval
+        query_vector = await self.vector_store_manager.embed_query(query)
+        
+        if self.semantic_cache:
+            cached = self.semantic_cache.get_similar(query, query_vector)
+            if cached is not None:
+                return cached, query_vector
+        
+        return None, query_vector
+    
+    async def process_query(self, query: str) -> Dict[str, Any]:
         """
         Process a legal query and generate an answer with citations.
         
@@ -219,67 +330,157 @@ class LegalRAGSystem:
         try:
             # Safety check for illegal queries
             if self._is_illegal_query(query):
-                logger.warning(f"Illegal query detected: {query[:50]}...")
+                logger.warning("Illegal query detected: %s...", query[:50])
                 return {
-                    "answer": "I cannot provide guidance on illegal activities. If you have questions about legal compliance or your rights, I'm happy to help with that instead." + LEGAL_DISCLAIMER,
+                    "answer": ILLEGAL_RESPONSE + LEGAL_DISCLAIMER,
                     "citations": [],
                     "has_context": False
                 }
             
-            # Retrieve relevant context
-            context, documents = self._retrieve_context(query)
+            cached, query_vector = await self._lookup_cache(query)
+            if cached is not None:
+                return cached
             
-            # If no context found, query LLM directly without RAG
-            if not context or not documents:
-                logger.warning("No context found, querying LLM directly...")
-                fallback_prompt = f"""You are a helpful legal AI assistant. Answer the following question to the best of your ability:
-
-Question: {query}
-
-Provide a clear and accurate answer."""
-                
-                response = self.llm.invoke(fallback_prompt)
-                answer = response.content + LEGAL_DISCLAIMER
-                
-                return {
-                    "answer": answer,
-                    "citations": [],
-                    "has_context": False
-                }
-            
-            # Generate answer using LLM with retrieved context
-            prompt = self.prompt_template.format(context=context, question=query)
+            result = await self._generate_answer(query, query_vector)
             
-            logger.info("Generating answer with LLM...")
-            response = self.llm.invoke(prompt)
-            answer = response.content
+            if self.semantic_cache:
+                self.semantic_cache.store(query, result, query_vector)
             
-            # Check if LLM couldn't answer from context, fallback to direct query
-            if "don't have enough" in answer.lower() or "insufficient information" in answer.lower():
-                logger.warning("RAG response insufficient, querying LLM directly...")
-                fallback_prompt = f"""You are a helpful legal AI assistant. Answer the following question to the best of your ability:
-
-Question: {query}
-
-Provide a clear and accurate answer."""
-                
-                response = self.llm.invoke(fallback_prompt)
-                answer = response.content
+            return result
             
-            # Add legal disclaimer
-            answer_with_disclaimer = answer + LEGAL_DISCLAIMER
+        except Exception as e:
+            logger.error("Error processing query: %s", e)
+            raise
+    
+    async def _generate_answer(self, query: str, query_vector: Sequence[float]) -> Dict[str, Any]:
+        """
+        Retrieve context and generate an answer with the LLM.
+        
+        Args:
+            query: User's legal question
+            query_vector: Embedding of the query
             
-            logger.info("Query processed successfully")
+        Returns:
+            Response dictionary in the same format as process_query
+        """
+        # Retrieve relevant context
+        context, documents = await self._retrieve_context(query, query_vector)
+        
+        # If no context found, query LLM directly without RAG
+        if not context or not documents:
+            logger.warning("No context found, querying LLM directly...")
+            response = await self.llm.ainvoke(FALLBACK_PROMPT.format(question=query))
+            answer = response.content + LEGAL_DISCLAIMER
             
             return {
-                "answer": answer_with_disclaimer,
+                "answer": answer,
                 "citations": [],
-                "has_context": True
+                "has_context": False
             }
+        
+        # Generate answer using LLM with retrieved context
+        prompt = self._build_prompt(context, query)
+        
+        logger.info("Generating answer with LLM...")
+        response = await self.llm.ainvoke(prompt)
+        answer = response.content
+        
+        # Check if LLM couldn't answer from context, fallback to direct query
+        if self._is_insufficient(answer):
+            logger.warning("RAG response insufficient, querying LLM directly...")
+            response = await self.llm.ainvoke(FALLBACK_PROMPT.format(question=query))
+            answer = response.content
+        
+        # Add legal disclaimer
+        answer_with_disclaimer = answer + LEGAL_DISCLAIMER
+        
+        logger.info("Query processed successfully")
+        
+        return {
+            "answer": answer_with_disclaimer,
+            "citations": [],
+            "has_context": True
+        }
+    
+    @staticmethod
+    def _is_insufficient(answer: str) -> bool:
+        """Check whether the LLM reported that the context could not answer the query."""
+        return _INSUFFICIENT_RE.search(answer) is not None
+    
+    async def stream_query(self, query: str) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Process a legal query and stream the answer as it is generated.
+        
+        Args:
+            query: User's legal question
             
-        except Exception as e:
-            logger.error(f"Error processing query: {str(e)}")
-            raise
+        Yields:
+            ("token", text) for each chunk of the answer, followed by a single
+            ("done", metadata) where metadata holds the disclaimer, citations
+            and has_context flag.
+        """
+        # Safety check for illegal queries
+        if self._is_illegal_query(query):
+            logger.warning("Illegal query detected: %s...", query[:50])
+            yield "token", ILLEGAL_RESPONSE
+            yield "done", {"disclaimer": LEGAL_DISCLAIMER, "citations": [], "has_context": False}
+            return
+        
+        cached, query_vector = await self._lookup_cache(query)
+        if cached is not None:
+            yield "token", cached["answer"].removesuffix(LEGAL_DISCLAIMER)
+            yield "done", {
+                "disclaimer": LEGAL_DISCLAIMER,
+                "citations": cached["citations"],
+                "has_context": cached["has_context"]
+            }
+            return
+        
+        context, documents = await self._retrieve_context(query, query_vector)
+        has_context = bool(context and documents)
+        
+        if has_context:
+            prompt = self._build_prompt(context, query)
+        else:
+            logger.warning("No context found, streaming LLM answer directly...")
+            prompt = FALLBACK_PROMPT.format(question=query)
+        
+        parts: List[str] = []
+        buffered = has_context
+        
+        async for chunk in self.llm.astream(prompt):
+            parts.append(chunk.content)
+            if not buffered:
+                yield "token", chunk.content
+                continue
+            
+            # Hold back the start of a RAG answer until we can tell whether the
+            # LLM is about to report insufficient context
+            head = "".join(parts)
+            if len(head) < _INSUFFICIENT_PROBE_CHARS:
+                continue
+            if self._is_insufficient(head):
+                break
+            buffered = False
+            yield "token", head
+        
+        answer = "".join(parts)
+        if buffered:
+            if has_context and self._is_insufficient(answer):
+                logger.warning("RAG response insufficient, streaming LLM answer directly...")
+                parts = []
+                async for chunk in self.llm.astream(FALLBACK_PROMPT.format(question=query)):
+                    parts.append(chunk.content)
+                    yield "token", chunk.content
+                answer = "".join(parts)
+            else:
+                yield "token", answer
+        
+        result = {"answer": answer + LEGAL_DISCLAIMER, "citations": [], "has_context": has_context}
+        if self.semantic_cache:
+            self.semantic_cache.store(query, result, query_vector)
+        
+        yield "done", {"disclaimer": LEGAL_DISCLAIMER, "citations": [], "has_context": has_context}
 
 
 # Global RAG system instance
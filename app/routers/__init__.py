@@ -0,0 +1,3 @@
+"""
+API routers mounted by the main FastAPI application.
+"""
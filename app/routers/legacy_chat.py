@@ -1,18 +1,25 @@
-import os
-import json
-from fastapi import FastAPI, Request
+"""
+Legacy Chat Router
+Plain-text + JSON chat endpoint backed by rule-based safety checks and the Gemini fallback client.
+Mounted under /v1 by app.main.
+"""
+
+import re
+import httpx
+import orjson
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
-from safety import classify, canned_response
-from llm_fallback_gemini import generate as fallback_generate
+from app.config import get_settings
+from app.safety import classify, canned_response
+from app.llm_fallback_gemini import agenerate as fallback_agenerate
 
-load_dotenv()
+FALLBACK_PROVIDER = get_settings().fallback_provider
 
-FALLBACK_PROVIDER = os.getenv("FALLBACK_PROVIDER", "gemini").lower()
+_DISCLAIMER_RE = re.compile(r"not legal advice", re.IGNORECASE)
 
-app = FastAPI(title="Legal Awareness Backend (Plain Text + JSON Supported)")
+router = APIRouter(tags=["legacy"])
 
 class ChatRes(BaseModel):
     reply: str
@@ -28,7 +35,7 @@ SYSTEM_STYLE = (
     "4) If unsure, say so and suggest checking official sources or consulting a lawyer/legal aid.\n"
 )
 
-def handle_message(user_id: str | None, message: str) -> ChatRes:
+async def handle_message(user_id: str | None, message: str, client: httpx.AsyncClient) -> ChatRes:
     label = classify(message)
 
     # Safety first: do not call model
@@ -36,15 +43,15 @@ def handle_message(user_id: str | None, message: str) -> ChatRes:
         return ChatRes(reply=canned_response(label), safety=label, provider="rules")
 
     # Call fallback model
-    reply = fallback_generate(system=SYSTEM_STYLE, user=message)
+    reply = await fallback_agenerate(system=SYSTEM_STYLE, user=message, client=client)
 
     # Hard-enforce disclaimer
-    if "not legal advice" not in reply.lower():
+    if not _DISCLAIMER_RE.search(reply):
         reply = "This is general information, not legal advice.\n\n" + reply
 
     return ChatRes(reply=reply, safety="ok", provider=FALLBACK_PROVIDER)
 
-@app.post("/chat", response_model=ChatRes)
+@router.post("/chat", response_model=ChatRes)
 async def chat(request: Request):
     """
     Accepts BOTH:
@@ -61,7 +68,7 @@ async def chat(request: Request):
     # A) JSON input
     if "application/json" in content_type:
         try:
-            payload = await request.json()
+            payload = orjson.loads(await request.body())
         except Exception:
             return JSONResponse(
                 status_code=400,
@@ -72,18 +79,19 @@ async def chat(request: Request):
 
     # B) Plain text input (or anything else)
     else:
-        raw = (await request.body()).decode("utf-8", errors="ignore").strip()
+        body = (await request.body()).strip()
 
-        # If client accidentally sent JSON as text/plain, try to parse it
-        if raw.startswith("{") and raw.endswith("}"):
+        # If client accidentally sent JSON as text/plain, try to parse it.
+        # Check the raw bytes so plain text is only decoded once.
+        if body[:1] == b"{" and body[-1:] == b"}":
             try:
-                payload = json.loads(raw)
+                payload = orjson.loads(body)
                 user_id = payload.get("user_id")
                 message = payload.get("message")
             except Exception:
-                message = raw
+                message = body.decode("utf-8", errors="ignore")
         else:
-            message = raw
+            message = body.decode("utf-8", errors="ignore")
 
     if not message:
         return JSONResponse(
@@ -91,8 +99,9 @@ async def chat(request: Request):
             content={"error": "Empty message. Send JSON {'message': '...'} or plain text body."},
         )
 
-    return handle_message(user_id, message)
+    # Shared HTTP/2 client created in the app lifespan
+    return await handle_message(user_id, message, request.app.state.http_client)
 
-@app.get("/")
+@router.get("/")
 def root():
-    return {"status": "ok", "hint": "Use POST /chat (JSON or text) or open /docs"}
\ No newline at end of file
+    return {"status": "ok", "hint": "Use POST /v1/chat (JSON or text) or open /docs"}
@@ -0,0 +1,197 @@
+import re
+from functools import lru_cache
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - x86-only, fall back to Aho–Corasick
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - fall back to the regex scan
+    ahocorasick = None
+
+ILLEGAL = [
+    r"\bforge\b",
+    r"\bfake\b.*\b(?:doc|document|evidence)\b",
+    r"\bbribe\b",
+    r"\bblackmail\b",
+    r"\bextort\b",
+    r"\bthreaten\b",
+]
+
+EMERGENCY = [
+    r"\bviolence\b",
+    r"\bassault\b",
+    r"\brape\b",
+    r"\bstalking\b",
+    r"\bkill myself\b",
+    r"\bsuicide\b",
+]
+
+# One combined pattern per label; IGNORECASE avoids lowercasing the input
+EMERGENCY_RE = re.compile("|".join(f"(?:{p})" for p in EMERGENCY), re.IGNORECASE | re.ASCII)
+ILLEGAL_RE = re.compile("|".join(f"(?:{p})" for p in ILLEGAL), re.IGNORECASE | re.ASCII)
+
+# Patterns that are just a word or phrase between \b anchors
+_LITERAL_RE = re.compile(r"\\b([a-z ]+)\\b")
+
+# Every pattern starts with a whole word the input must contain to match
+_TRIGGER_WORDS = frozenset(re.match(r"\\b(\w+)", p).group(1) for p in ILLEGAL + EMERGENCY)
+_WORD_RE = re.compile(r"\w+", re.ASCII)
+
+
+def _split_patterns(patterns):
+    """Split patterns into plain keywords and the ones that need a regex."""
+    keywords, residual = [], []
+    for p in patterns:
+        m = _LITERAL_RE.fullmatch(p)
+        if m:
+            keywords.append(m.group(1))
+        else:
+            residual.append(p)
+    return keywords, residual
+
+
+def _compile_residual(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE | re.ASCII)
+
+
+def _build_automaton():
+    """Build one Aho–Corasick automaton holding the keywords of both labels."""
+    automaton = ahocorasick.Automaton()
+    residual = {}
+    for label, patterns in (("emergency", EMERGENCY), ("illegal", ILLEGAL)):
+        keywords, rest = _split_patterns(patterns)
+        for word in keywords:
+            automaton.add_word(word, (label, len(word)))
+        residual[label] = _compile_residual(rest)
+    automaton.make_automaton()
+    return automaton, residual
+
+
+def _build_hyperscan_db():
+    """Compile all patterns of both labels into one Hyperscan block-mode database."""
+    patterns = [(p, "emergency") for p in EMERGENCY] + [(p, "illegal") for p in ILLEGAL]
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[p.encode() for p, _ in patterns],
+        ids=list(range(len(patterns))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+    )
+    return db, [label for _, label in patterns]
+
+
+if hyperscan is not None:
+    _HS_DB, _HS_LABELS = _build_hyperscan_db()
+elif ahocorasick is not None:
+    _AUTOMATON, _RESIDUAL = _build_automaton()
+
+
+def _is_word_char(c: str) -> bool:
+    # Same notion of a word character as \b under re.ASCII
+    return c.isascii() and (c.isalnum() or c == "_")
+
+
+def _scan_keywords(t: str):
+    """Return the strongest label among whole-word keyword hits, or None."""
+    found = None
+    for end, (label, length) in _AUTOMATON.iter(t):
+        start = end - length + 1
+        if start > 0 and _is_word_char(t[start - 1]):
+            continue
+        if end + 1 < len(t) and _is_word_char(t[end + 1]):
+            continue
+        if label == "emergency":
+            return label
+        found = label
+    return found
+
+
+def _classify_hyperscan(t: str) -> str:
+    labels = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        labels.add(_HS_LABELS[pattern_id])
+        # A non-zero return stops the scan; nothing outranks an emergency
+        return _HS_LABELS[pattern_id] == "emergency"
+
+    try:
+        _HS_DB.scan(t.encode("utf-8"), match_event_handler=on_match)
+    except hyperscan.ScanTerminated:
+        pass
+
+    if "emergency" in labels:
+        return "emergency"
+    if "illegal" in labels:
+        return "illegal"
+    return "ok"
+
+
+def _classify_automaton(t: str) -> str:
+    found = _scan_keywords(t.lower())
+    if found == "emergency":
+        return found
+    # Multi-token patterns are only checked when no keyword decided the label
+    if _RESIDUAL["emergency"] is not None and _RESIDUAL["emergency"].search(t):
+        return "emergency"
+    if found == "illegal":
+        return found
+    if _RESIDUAL["illegal"] is not None and _RESIDUAL["illegal"].search(t):
+        return "illegal"
+    return "ok"
+
+
+def _classify_regex(t: str) -> str:
+    if EMERGENCY_RE.search(t):
+        return "emergency"
+    if ILLEGAL_RE.search(t):
+        return "illegal"
+    return "ok"
+
+
+def _classify(t: str) -> str:
+    # Cheap rejection for the common case of no trigger word at all
+    if _TRIGGER_WORDS.isdisjoint(_WORD_RE.findall(t.lower())):
+        return "ok"
+    # Prefer Hyperscan's SIMD matcher, then Aho–Corasick, then plain regex
+    if hyperscan is not None:
+        return _classify_hyperscan(t)
+    if ahocorasick is not None:
+        return _classify_automaton(t)
+    return _classify_regex(t)
+
+
+# Recent results are cached; longer inputs skip the cache to bound its memory
+_CLASSIFY_CACHE_SIZE = 1024
+_CLASSIFY_CACHE_MAX_CHARS = 2048
+
+
+@lru_cache(maxsize=_CLASSIFY_CACHE_SIZE)
+def _classify_cached(t: str) -> str:
+    return _classify(t)
+
+
+def classify(text: str) -> str:
+    t = text or ""
+    if len(t) <= _CLASSIFY_CACHE_MAX_CHARS:
+        return _classify_cached(t)
+    return _classify(t)
+
+
+def canned_response(label: str) -> str:
+    if label == "illegal":
+        return (
+            "I can’t help with anything illegal or harmful.\n"
+            "This is general information, not legal advice.\n"
+            "If you explain what happened, I can suggest lawful options (reporting channels, evidence preservation, and next steps)."
+        )
+    if label == "emergency":
+        return (
+            "If you are in immediate danger, contact emergency services now.\n"
+            "In India you can call 112.\n"
+            "This is general information, not legal advice."
+        )
+    return ""
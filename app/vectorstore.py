@@ -4,18 +4,21 @@ Handles initialization and interaction with ChromaDB vector database.
 """
 
 import os
+import re
+import asyncio
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from app.config import Settings, get_settings
+
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class VectorStoreManager:
     """
@@ -25,25 +28,36 @@ class VectorStoreManager:
     methods to retrieve relevant legal context based on queries.
     """
     
-    def __init__(self, persist_directory: str = None, google_api_key: str = None):
+    def __init__(
+        self,
+        persist_directory: str = None,
+        google_api_key: str = None,
+        embedding_cache_size: int = 4096,
+        settings: Optional[Settings] = None
+    ):
         """
         Initialize the vector store manager.
         
         Args:
             persist_directory: Path to the ChromaDB database directory
             google_api_key: Google API key for embeddings
+            embedding_cache_size: Maximum number of query embeddings kept in memory
+            settings: Application settings (defaults to the global settings)
         """
-        self.persist_directory = persist_directory or os.getenv(
-            "CHROMA_DB_PATH", 
-            "chroma_db_gemini"
-        )
-        self.google_api_key = google_api_key or os.getenv("GOOGLE_API_KEY")
+        settings = settings or get_settings()
+        self.persist_directory = persist_directory or settings.chroma_db_path
+        self.google_api_key = google_api_key or settings.google_api_key
         
         if not self.google_api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
         self.embeddings = None
         self.vector_store = None
+        
+        # LRU of query embeddings keyed on normalized query text
+        self.embedding_cache_size = embedding_cache_size
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        
         self._initialize_vector_store()
     
     def _initialize_vector_store(self):
@@ -56,11 +70,11 @@ class VectorStoreManager:
                 google_api_key=self.google_api_key
             )
             
-            logger.info(f"Loading ChromaDB from: {self.persist_directory}")
+            logger.info("Loading ChromaDB from: %s", self.persist_directory)
             
             # Create directory if it doesn't exist
             if not os.path.exists(self.persist_directory):
-                logger.warning(f"ChromaDB directory not found. Creating new database at: {self.persist_directory}")
+                logger.warning("ChromaDB directory not found. Creating new database at: %s", self.persist_directory)
                 os.makedirs(self.persist_directory, exist_ok=True)
             
             self.vector_store = Chroma(
@@ -70,7 +84,7 @@ class VectorStoreManager:
             
             logger.info("Vector store initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize vector store: {str(e)}")
+            logger.error("Failed to initialize vector store: %s", e)
             raise
     
     def get_retriever(self, k: int = 10, score_threshold: float = 0.3):
@@ -95,6 +109,73 @@ class VectorStoreManager:
             }
         )
     
+    async def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the Gemini embeddings model.
+        
+        Results are cached by case- and whitespace-normalized text, so
+        retyped questions such as "What is Article 21?" and
+        "what is  article 21?" reuse one embedding call.
+        
+        Args:
+            query: The text to embed
+            
+        Returns:
+            Embedding vector for the query
+        """
+        if not self.embeddings:
+            raise RuntimeError("Embeddings not initialized")
+        
+        key = _WHITESPACE_RE.sub(" ", query.lower().strip())
+        embedding = self._embedding_cache.get(key)
+        if embedding is not None:
+            self._embedding_cache.move_to_end(key)
+            return embedding
+        
+        embedding = await self.embeddings.aembed_query(query)
+        self._embedding_cache[key] = embedding
+        if len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+        return embedding
+    
+    async def retrieve(
+        self,
+        query: str,
+        k: int = 10,
+        threshold: float = 0.3,
+        embedding: Optional[Sequence[float]] = None
+    ) -> Tuple[List[Document], Sequence[float]]:
+        """
+        Retrieve documents above a relevance threshold in a single search.
+        
+        The query is embedded at most once and searched by vector, so callers
+        that already hold the embedding (e.g. the semantic cache) can pass it in.
+        
+        Args:
+            query: The search query
+            k: Maximum number of documents to return
+            threshold: Minimum relevance score (0 to 1) for a document to be kept
+            embedding: Precomputed query embedding, if available
+            
+        Returns:
+            Tuple of (relevant documents, query embedding)
+        """
+        if not self.vector_store:
+            raise RuntimeError("Vector store not initialized")
+        
+        if embedding is None:
+            embedding = await self.embed_query(query)
+        
+        # Chroma returns raw distances here; convert with the store's own relevance function
+        relevance_fn = self.vector_store._select_relevance_score_fn()
+        results = await asyncio.to_thread(
+            self.vector_store.similarity_search_by_vector_with_relevance_scores,
+            list(embedding),
+            k=k
+        )
+        documents = [doc for doc, distance in results if relevance_fn(distance) >= threshold]
+        return documents, embedding
+    
     def similarity_search(self, query: str, k: int = 10) -> list:
         """
         Perform similarity search on the vector store.
@@ -113,7 +194,7 @@ class VectorStoreManager:
             documents = self.vector_store.similarity_search(query, k=k)
             return documents
         except Exception as e:
-            logger.error(f"Error during similarity search: {str(e)}")
+            logger.error("Error during similarity search: %s", e)
             raise
 
 
@@ -6,7 +6,15 @@ Checks if all requirements are met for cloud deployment.
 
 import os
 import sys
-from pathlib import Path
+import importlib.util
+
+def _list_dir(path):
+    """Return the set of entry names in a directory (empty if it doesn't exist)."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
 
 def check_files():
     """Check if required files exist."""
@@ -30,8 +38,14 @@ def check_files():
     missing_files = []
     present_files = []
     
+    # One directory listing per parent directory instead of a stat per file
+    listings = {}
+    
     for file in required_files:
-        if os.path.exists(file):
+        dirname, basename = os.path.split(file)
+        if dirname not in listings:
+            listings[dirname] = _list_dir(dirname or '.')
+        if basename in listings[dirname]:
             present_files.append(file)
             print(f"✅ {file}")
         else:
@@ -48,8 +62,8 @@ def check_env_vars():
     print("=" * 60)
     print()
     
-    from dotenv import load_dotenv
-    load_dotenv()
+    from app.env import load
+    load()
     
     required_vars = {
         'GOOGLE_API_KEY': 'Google Gemini API Key',
@@ -74,6 +88,15 @@ def check_env_vars():
     print()
     return all_set
 
+def _walk(path):
+    """Yield the DirEntry of every file under path, recursively."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path)
+            else:
+                yield entry
+
 def check_vector_db():
     """Check if vector database exists."""
     print("=" * 60)
@@ -85,12 +108,17 @@ def check_vector_db():
     
     if os.path.exists(chroma_path):
         # Check if it has content
-        files = list(Path(chroma_path).rglob('*'))
-        total_size = sum(f.stat().st_size for f in files if f.is_file())
+        # DirEntry caches the type from the directory read, so only sizes need a stat.
+        # Accumulate while walking rather than collecting every entry first.
+        file_count = 0
+        total_size = 0
+        for entry in _walk(chroma_path):
+            file_count += 1
+            total_size += entry.stat(follow_symlinks=False).st_size
         total_size_mb = total_size / (1024 * 1024)
         
         print(f"✅ Vector database found: {chroma_path}")
-        print(f"   Files: {len(files)}")
+        print(f"   Files: {file_count}")
         print(f"   Size: {total_size_mb:.2f} MB")
         print()
         return True
@@ -101,7 +129,7 @@ def check_vector_db():
         return False
 
 def check_dependencies():
-    """Check if dependencies can be imported."""
+    """Check if dependencies are installed."""
     print("=" * 60)
     print("DEPENDENCIES CHECK")
     print("=" * 60)
@@ -120,16 +148,38 @@ def check_dependencies():
     all_imported = True
     
     for package in required_packages:
-        try:
-            __import__(package)
+        # find_spec locates the package without executing its __init__
+        if importlib.util.find_spec(package) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} - NOT INSTALLED")
             all_imported = False
     
     print()
     return all_imported
 
+def _parse_git_status(output):
+    """
+    Parse `git status -b --porcelain=v2` output.
+
+    Returns the upstream branch (or None) and the changed paths formatted
+    like short status lines, e.g. " M app/main.py" or "?? notes.txt".
+    """
+    upstream = None
+    changes = []
+    for line in output.splitlines():
+        if line.startswith('# branch.upstream '):
+            upstream = line.split(' ', 2)[2]
+        elif line.startswith(('1 ', '2 ', 'u ')):
+            # Ordinary, renamed/copied and unmerged entries carry 8, 9 and 10 fields before the path
+            fields = {'1': 8, '2': 9, 'u': 10}[line[0]]
+            xy = line[2:4].replace('.', ' ')
+            path = line.split(' ', fields)[fields].replace('\t', ' <- ')
+            changes.append(f"{xy} {path}")
+        elif line.startswith('? '):
+            changes.append(f"?? {line[2:]}")
+    return upstream, changes
+
 def check_git():
     """Check git status."""
     print("=" * 60)
@@ -140,27 +190,26 @@ def check_git():
     if os.path.exists('.git'):
         print("✅ Git repository initialized")
         
-        # Check for uncommitted changes
+        # One status call reports both the changed files and the upstream branch
         import subprocess
         try:
-            result = subprocess.run(['git', 'status', '--porcelain'], 
+            result = subprocess.run(['git', 'status', '-b', '--porcelain=v2'], 
                                   capture_output=True, text=True)
-            if result.stdout.strip():
+            upstream, changes = _parse_git_status(result.stdout)
+            if changes:
                 print("⚠️  You have uncommitted changes:")
-                print(result.stdout)
+                print("\n".join(changes))
                 print("\nRun: git add . && git commit -m 'Prepare for deployment'")
             else:
                 print("✅ No uncommitted changes")
             
             # Check for remote
-            result = subprocess.run(['git', 'remote', '-v'], 
-                                  capture_output=True, text=True)
-            if result.stdout.strip():
-                print("✅ Git remote configured:")
-                print(result.stdout)
+            if upstream:
+                print(f"✅ Git remote configured (tracking {upstream})")
             else:
-                print("⚠️  No git remote configured")
+                print("⚠️  No git remote tracked by the current branch")
                 print("\nAdd remote: git remote add origin https://github.com/username/repo.git")
+                print("Then push with: git push -u origin main")
         except Exception as e:
             print(f"⚠️  Could not check git status: {e}")
     else:
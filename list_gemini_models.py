@@ -1,9 +1,9 @@
 """List available Gemini models"""
 import os
-from dotenv import load_dotenv
 from google import genai
+from app.env import load
 
-load_dotenv()
+load()
 
 client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 
@@ -12,7 +12,9 @@ print("Available Gemini Models")
 print("=" * 60)
 print()
 
-for model in client.models.list():
+# Ask for the largest page so the list usually arrives in one request;
+# the pager still fetches any further pages lazily while we print
+for model in client.models.list(config={"page_size": 1000}):
     print(f"Model: {model.name}")
     print(f"  Display Name: {model.display_name}")
     print()
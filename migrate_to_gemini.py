@@ -5,21 +5,105 @@ This script migrates the existing vector database from OpenAI embeddings to Goog
 
 import os
 import sys
-from dotenv import load_dotenv
+import uuid
+import asyncio
+import hashlib
+import sqlite3
+import numpy as np
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils.batch_utils import create_batches
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from tqdm import tqdm
+from app.env import load
 
 # Load environment variables
-load_dotenv()
+load()
 
 # Configuration
 OLD_DB_PATH = "lawglance/chroma_db_legal_bot_part1"
 NEW_DB_PATH = "chroma_db_gemini"
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+BATCH_SIZE = 50  # Documents per embedding request
+EMBED_CONCURRENCY = int(os.getenv("GEMINI_EMBED_CONCURRENCY", 8))  # Embedding requests in flight
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+EMBED_CACHE_PATH = "embed_cache.sqlite"  # Embeddings kept across runs so a retry only embeds what's missing
+SQLITE_MAX_VARIABLES = 900  # Stay under SQLite's bound-parameter limit in IN (...) lookups
+
+
+def open_embed_cache(path=EMBED_CACHE_PATH):
+    """Open (creating if needed) the on-disk embedding cache."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS e (h BLOB PRIMARY KEY, v BLOB)")
+    return conn
+
+
+def _cache_key(text):
+    """Content hash of a text, scoped to the embedding model."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\0{text}".encode("utf-8")).digest()
+
+
+def _cache_get(conn, keys):
+    """Return {key: vector} for the keys present in the cache."""
+    found = {}
+    for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+        chunk = keys[i:i + SQLITE_MAX_VARIABLES]
+        rows = conn.execute(
+            f"SELECT h, v FROM e WHERE h IN ({','.join('?' * len(chunk))})", chunk
+        )
+        for key, blob in rows:
+            found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+    return found
+
+
+def _cache_put(conn, keys, vectors):
+    """Store freshly computed vectors and commit, so progress survives a failure."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO e VALUES (?, ?)",
+        [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in zip(keys, vectors)]
+    )
+    conn.commit()
+
+
+async def embed_in_batches(embeddings, texts, cache, batch_size=BATCH_SIZE, concurrency=EMBED_CONCURRENCY):
+    """
+    Embed texts in batches, keeping up to `concurrency` requests in flight.
+
+    Texts already in the cache are not sent to the API, and every finished
+    batch is written to the cache straight away.
+    """
+    keys = [_cache_key(text) for text in texts]
+    vectors = _cache_get(cache, list(set(keys)))
+
+    # Unique texts still to embed, in document order
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    missing_keys = list(missing)
+    print(f"✓ {sum(key in vectors for key in keys)} of {len(texts)} embeddings loaded from cache")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = tqdm(total=len(missing_keys), desc="Embedding")
+
+    async def embed_batch(batch_keys):
+        async with semaphore:
+            batch_vectors = await embeddings.aembed_documents([missing[key] for key in batch_keys])
+        _cache_put(cache, batch_keys, batch_vectors)
+        vectors.update(zip(batch_keys, batch_vectors))
+        progress.update(len(batch_keys))
+
+    try:
+        await asyncio.gather(*(
+            embed_batch(missing_keys[i:i + batch_size]) for i in range(0, len(missing_keys), batch_size)
+        ))
+    finally:
+        progress.close()
+
+    return [vectors[key] for key in keys]
+
 
 def migrate_database():
     """Migrate from OpenAI embeddings to Gemini embeddings."""
@@ -84,7 +168,7 @@ def migrate_database():
         # Step 3: Initialize Gemini embeddings
         print("Step 3: Initializing Google Gemini embeddings...")
         embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/gemini-embedding-001",
+            model=EMBEDDING_MODEL,
             google_api_key=GOOGLE_API_KEY
         )
         print("✓ Gemini embeddings initialized")
@@ -105,13 +189,29 @@ def migrate_database():
         print("✓ New vector store created")
         print()
         
-        # Step 5: Add documents in batches
+        # Step 5: Embed concurrently, then write the precomputed vectors
         print("Step 5: Adding documents to new database...")
-        batch_size = 50  # Process in smaller batches to avoid rate limits
-        
-        for i in tqdm(range(0, len(documents), batch_size), desc="Migrating"):
-            batch = documents[i:i + batch_size]
-            new_vector_store.add_documents(batch)
+        texts = [doc.page_content for doc in documents]
+        cache = open_embed_cache()
+        try:
+            vectors = asyncio.run(embed_in_batches(embeddings, texts, cache))
+        finally:
+            cache.close()
+
+        # Write everything in as few inserts as Chroma allows (one per max batch size)
+        for ids, batch_vectors, metadatas, batch_texts in create_batches(
+            api=new_vector_store._client,
+            ids=[str(uuid.uuid4()) for _ in documents],
+            embeddings=vectors,
+            metadatas=[doc.metadata or None for doc in documents],
+            documents=texts
+        ):
+            new_vector_store._collection.add(
+                ids=ids,
+                embeddings=batch_vectors,
+                documents=batch_texts,
+                metadatas=metadatas
+            )
         
         print()
         print("✓ All documents migrated successfully")
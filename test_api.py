@@ -3,8 +3,10 @@ Test script for the Legal AI Backend
 Run this after starting the server to verify everything works.
 """
 
+import asyncio
 import requests
-import json
+import httpx
+import orjson
 import sys
 
 # Server URL
@@ -16,25 +18,27 @@ def test_health():
     try:
         response = requests.get(f"{BASE_URL}/health", timeout=5)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}\n")
+        print(f"Response: {orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode()}\n")
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {str(e)}\n")
         return False
 
-def test_chat(query):
+async def test_chat(client, query):
     """Test the chat endpoint with a query."""
-    print(f"Testing /chat endpoint with query: '{query}'...")
     try:
-        response = requests.post(
+        response = await client.post(
             f"{BASE_URL}/chat",
-            json={"query": query},
-            timeout=30
+            content=orjson.dumps({"query": query}),
+            headers={"content-type": "application/json"}
         )
+        # Print only once the response is in so concurrent results don't interleave
+        print("=" * 60)
+        print(f"Testing /chat endpoint with query: '{query}'...")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print("\n--- Answer ---")
             print(data["answer"])
             print("\n--- Citations ---")
@@ -51,9 +55,16 @@ def test_chat(query):
         
         return response.status_code == 200
     except Exception as e:
+        print("=" * 60)
+        print(f"Testing /chat endpoint with query: '{query}'...")
         print(f"Error: {str(e)}\n")
         return False
 
+async def run_chat_tests(queries):
+    """Send all chat queries concurrently."""
+    async with httpx.AsyncClient(timeout=30) as client:
+        return await asyncio.gather(*(test_chat(client, query) for query in queries))
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -72,24 +83,17 @@ def main():
     print("=" * 60)
     print()
     
-    # Test chat endpoint with various queries
+    # Test chat endpoint with various queries, plus an illegal query
+    # for the safety protocol, all sent at once
     test_queries = [
         "What are the fundamental rights in the Indian Constitution?",
         "What is the Bharatiya Nyaya Sanhita?",
-        "Tell me about consumer protection laws in India"
+        "Tell me about consumer protection laws in India",
+        "How can I evade taxes?"
     ]
     
-    for query in test_queries:
-        print("=" * 60)
-        test_chat(query)
-        print()
-    
-    # Test illegal query
-    print("=" * 60)
-    print("Testing safety protocol with illegal query...")
-    print("=" * 60)
+    asyncio.run(run_chat_tests(test_queries))
     print()
-    test_chat("How can I evade taxes?")
     
     print("=" * 60)
     print("All tests completed!")